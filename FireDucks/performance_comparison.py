@@ -1,30 +1,54 @@
 import pandas as pd
 import time
 import numpy as np
-import polars as pl
-import fireducks as fd
-from fireducks.fireducks_ext import FireDucksContext
-from fireducks.core import get_fireducks_options, set_fireducks_option
 import psutil
+from numba import njit, prange, get_num_threads
 import gc
-from typing import Callable, Dict, Any
+import tracemalloc
+from typing import Callable, Dict, Any, List
 import statistics
+import argparse
+import json
+import subprocess
+import sys
 
 def get_memory_usage():
     """Get current memory usage in MB."""
     process = psutil.Process()
     return process.memory_info().rss / 1024 / 1024
 
-def benchmark_operation(operation: Callable, name: str, num_runs: int = 3) -> Dict[str, Any]:
-    """Run an operation multiple times and collect metrics."""
+def measure_peak_alloc(operation: Callable) -> float:
+    """Peak Python/NumPy allocation in MB during one untimed run of operation."""
+    tracemalloc.start()
+    try:
+        result = operation()
+        del result
+        _, peak_traced = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak_traced / 1024 / 1024
+
+def benchmark_operation(operation: Callable, name: str, num_runs: int = 3,
+                        trace_alloc: bool = True) -> Dict[str, Any]:
+    """Run an operation multiple times and collect metrics.
+
+    trace_alloc should be False for frameworks that allocate outside Python's
+    allocator (e.g. Polars), where tracemalloc would report a misleading 0MB.
+    """
     gc.collect()  # Clear any garbage before starting
     initial_memory = get_memory_usage()
     times = []
     
-    for _ in range(num_runs):
-        start_time = time.time()
-        result = operation()
-        times.append(time.time() - start_time)
+    # Keep collector pauses out of the timings
+    gc.disable()
+    try:
+        for _ in range(num_runs):
+            t0 = time.perf_counter_ns()
+            result = operation()
+            times.append((time.perf_counter_ns() - t0) / 1e9)
+            del result
+    finally:
+        gc.enable()
     
     final_memory = get_memory_usage()
     
@@ -32,119 +56,251 @@ def benchmark_operation(operation: Callable, name: str, num_runs: int = 3) -> Di
         'mean_time': statistics.mean(times),
         'std_time': statistics.stdev(times) if len(times) > 1 else 0,
         'memory_delta': final_memory - initial_memory,
+        'peak_alloc': measure_peak_alloc(operation) if trace_alloc else None,
         'name': name
     }
 
 def format_metrics(metrics: Dict[str, Any]) -> str:
     """Format metrics into a readable string."""
+    peak = "n/a" if metrics['peak_alloc'] is None else f"{metrics['peak_alloc']:.1f}MB"
     return (f"{metrics['name']}: {metrics['mean_time']:.3f}s ± {metrics['std_time']:.3f}s, "
-            f"Memory: {metrics['memory_delta']:.1f}MB")
-
-# Enable FireDucks benchmark mode
-get_fireducks_options().set_benchmark_mode(True)
-set_fireducks_option("fireducks-version", True)
-
-# Create sample data
-size = 1000000
-data = {
-    'id': range(size),
-    'value': np.random.rand(size),
-    'category': np.random.choice(['A', 'B', 'C'], size),
-    'timestamp': pd.date_range('2024-01-01', periods=size, freq='s'),
-    'text': np.random.choice(['foo', 'bar', 'baz', 'qux'], size)
-}
-
-print("Testing performance across Pandas, Polars, and FireDucks...")
-print(f"Dataset size: {size:,} rows")
-print("\nInitializing frameworks...")
-
-# Initialize frameworks
-pd_df = pd.DataFrame(data)
-pl_df = pl.DataFrame(data)
-fd_context = FireDucksContext()
-fd_data = {k: np.array(v) if not isinstance(v, pd.DatetimeIndex) else np.array(v.astype(np.int64)) 
-          for k, v in data.items()}
-
-frameworks = {
-    'Pandas': {'df': pd_df, 'name': 'Pandas'},
-    'Polars': {'df': pl_df, 'name': 'Polars'},
-    'FireDucks': {'df': fd_data, 'name': 'FireDucks'}
-}
-
-# Define operations for each framework
-operations = {
-    'Simple GroupBy': {
-        'Pandas': lambda: pd_df.groupby('category')['value'].mean(),
-        'Polars': lambda: pl_df.group_by('category').agg(pl.col('value').mean()),
-        'FireDucks': lambda: {cat: np.mean(fd_data['value'][fd_data['category'] == cat]) 
-                            for cat in np.unique(fd_data['category'])}
-    },
-    'Complex GroupBy': {
-        'Pandas': lambda: pd_df.groupby(['category', 'text'])
-                              .agg({'value': ['mean', 'std', 'count']}),
-        'Polars': lambda: pl_df.group_by(['category', 'text'])
-                              .agg([
-                                  pl.col('value').mean().alias('value_mean'),
-                                  pl.col('value').std().alias('value_std'),
-                                  pl.col('value').count().alias('value_count')
-                              ]),
-        'FireDucks': lambda: {
-            (cat, txt): {
-                'mean': np.mean(fd_data['value'][mask]),
-                'std': np.std(fd_data['value'][mask]),
-                'count': np.sum(mask)
-            }
-            for cat in np.unique(fd_data['category'])
-            for txt in np.unique(fd_data['text'])
-            if (mask := (fd_data['category'] == cat) & (fd_data['text'] == txt)).any()
-        }
-    },
-    'Sort': {
-        'Pandas': lambda: pd_df.sort_values(['value', 'category']),
-        'Polars': lambda: pl_df.sort(['value', 'category']),
-        'FireDucks': lambda: {
-            k: v[np.lexsort((fd_data['category'], fd_data['value']))]
-            for k, v in fd_data.items()
-        }
-    },
-    'Filter with Computation': {
-        'Pandas': lambda: pd_df[
+            f"Memory: {metrics['memory_delta']:.1f}MB, Peak alloc: {peak}")
+
+@njit(parallel=True, cache=True)
+def filter_kernel(value, cat_code, code_a, code_b, n_chunks, out_val, out_cat, out_idx):
+    """Select rows with value above the mean and category code_a or code_b.
+
+    One parallel pass computes the mean, a second filters each thread's chunk
+    straight into the outputs; the chunks are then packed to the front.
+    n_chunks is passed in (normally get_num_threads()) so the kernel can be cached.
+    Returns the number of selected rows.
+    """
+    n = value.size
+    total = 0.0
+    for i in prange(n):
+        total += value[i]
+    mean = total / n
+
+    chunk = (n + n_chunks - 1) // n_chunks
+    counts = np.zeros(n_chunks, np.int64)
+    for t in prange(n_chunks):
+        start = t * chunk
+        end = min(start + chunk, n)
+        k = start
+        for i in range(start, end):
+            if value[i] > mean and (cat_code[i] == code_a or cat_code[i] == code_b):
+                out_val[k] = value[i]
+                out_cat[k] = cat_code[i]
+                out_idx[k] = i
+                k += 1
+        counts[t] = k - start
+
+    # Chunk t's rows start at t * chunk, which is never before pos
+    pos = 0
+    for t in range(n_chunks):
+        start = t * chunk
+        for k in range(start, start + counts[t]):
+            out_val[pos] = out_val[k]
+            out_cat[pos] = out_cat[k]
+            out_idx[pos] = out_idx[k]
+            pos += 1
+    return pos
+
+FRAMEWORKS = ['Pandas', 'Polars', 'FireDucks']
+OPERATIONS = ['Simple GroupBy', 'Complex GroupBy', 'Sort', 'Filter with Computation']
+SEED = 42
+BATCHED_OPERATION = 'All Operations (batched)'
+# Sorted, fixed-width label sets for the string columns
+CATEGORY_LABELS = np.array(['A', 'B', 'C'], dtype='U1')
+TEXT_LABELS = np.array(['bar', 'baz', 'foo', 'qux'], dtype='U3')
+
+def make_data(size: int) -> Dict[str, Any]:
+    """Create the sample dataset; seeded so every framework sees the same rows."""
+    np.random.seed(SEED)
+    return {
+        'id': range(size),
+        'value': np.random.rand(size),
+        'category': np.random.choice(CATEGORY_LABELS, size),
+        'timestamp': pd.date_range('2024-01-01', periods=size, freq='s'),
+        'text': np.random.choice(TEXT_LABELS, size)
+    }
+
+def pandas_operations(data: Dict[str, Any]) -> Dict[str, Callable]:
+    """Build the Pandas frame and its benchmark operations."""
+    pd_df = pd.DataFrame(data)
+    return {
+        'Simple GroupBy': lambda: pd_df.groupby('category')['value'].mean(),
+        'Complex GroupBy': lambda: pd_df.groupby(['category', 'text'])
+                                       .agg({'value': ['mean', 'std', 'count']}),
+        'Sort': lambda: pd_df.sort_values(['value', 'category']),
+        'Filter with Computation': lambda: pd_df[
             (pd_df['value'] > pd_df['value'].mean()) & 
             (pd_df['category'].isin(['A', 'B']))
-        ],
-        'Polars': lambda: pl_df.filter(
+        ]
+    }
+
+def polars_operations(data: Dict[str, Any]) -> Dict[str, Callable]:
+    """Build the Polars frame and its benchmark operations."""
+    import polars as pl
+
+    lf = pl.DataFrame(data).lazy()
+    queries = {
+        'Simple GroupBy': lf.group_by('category').agg(pl.col('value').mean()),
+        'Complex GroupBy': lf.group_by(['category', 'text'])
+                             .agg([
+                                 pl.col('value').mean().alias('value_mean'),
+                                 pl.col('value').std().alias('value_std'),
+                                 pl.col('value').count().alias('value_count')
+                             ]),
+        'Sort': lf.sort(['value', 'category']),
+        'Filter with Computation': lf.filter(
             (pl.col('value') > pl.col('value').mean()) & 
             pl.col('category').is_in(['A', 'B'])
-        ),
-        'FireDucks': lambda: {
-            k: v[value_mask & category_mask] 
-            for k, v in fd_data.items()
-            if (value_mask := fd_data['value'] > np.mean(fd_data['value'])) is not None
-            and (category_mask := np.isin(fd_data['category'], ['A', 'B'])) is not None
+        )
+    }
+    operations = {name: (lambda q=q: pl.collect_all([q])[0]) for name, q in queries.items()}
+    # All four queries in one graph, letting Polars share scans across them
+    operations[BATCHED_OPERATION] = lambda: pl.collect_all(list(queries.values()))
+    return operations
+
+def fireducks_operations(data: Dict[str, Any]) -> Dict[str, Callable]:
+    """Build the FireDucks column arrays and their benchmark operations."""
+    from fireducks.fireducks_ext import FireDucksContext
+    from fireducks.core import get_fireducks_options, set_fireducks_option
+
+    # Enable FireDucks benchmark mode
+    get_fireducks_options().set_benchmark_mode(True)
+    set_fireducks_option("fireducks-version", True)
+
+    fd_context = FireDucksContext()
+    fd_data = {k: np.array(v) if not isinstance(v, pd.DatetimeIndex) else np.array(v.astype(np.int64)) 
+              for k, v in data.items() if k not in ('category', 'text')}
+
+    # Dictionary-encode the string columns so FireDucks masks compare int8 codes;
+    # the label sets are known and sorted, so a binary search replaces np.unique
+    fd_data['category_code'] = np.searchsorted(CATEGORY_LABELS, data['category']).astype(np.int8)
+    fd_data['text_code'] = np.searchsorted(TEXT_LABELS, data['text']).astype(np.int8)
+    category_code = {label: code for code, label in enumerate(CATEGORY_LABELS)}
+
+    # Compile the Numba kernel up front so JIT time isn't counted in the benchmark
+    warmup = fd_data['value'][:16]
+    filter_kernel(warmup, fd_data['category_code'][:16], 0, 1, get_num_threads(),
+                  np.empty_like(warmup), np.empty(16, np.int8), np.empty(16, np.int64))
+
+    def fd_filter_with_computation() -> Dict[str, np.ndarray]:
+        """Keep rows above the mean value in category A or B using the fused kernel.
+
+        Like the Sort benchmark, the remaining columns are not gathered; 'row'
+        holds the selected row positions for that.
+        """
+        values = fd_data['value']
+        out_val = np.empty_like(values)
+        out_cat = np.empty_like(fd_data['category_code'])
+        out_idx = np.empty(values.size, np.int64)
+        n = filter_kernel(values, fd_data['category_code'], category_code['A'], category_code['B'],
+                          get_num_threads(), out_val, out_cat, out_idx)
+        return {'value': out_val[:n], 'category_code': out_cat[:n], 'row': out_idx[:n]}
+
+    def fd_complex_groupby() -> Dict[str, np.ndarray]:
+        """Mean, std and count per (category, text) pair from three bincount passes."""
+        # The codes already form a small dense key, so bincount beats sorting the
+        # rows (np.lexsort + np.add.reduceat) to find group boundaries
+        keys = fd_data['category_code'] * len(TEXT_LABELS) + fd_data['text_code']
+        values = fd_data['value']
+        counts = np.bincount(keys)
+        sums = np.bincount(keys, weights=values)
+        squares = np.bincount(keys, weights=values * values)
+        present = counts > 0
+        counts, sums, squares = counts[present], sums[present], squares[present]
+        means = sums / counts
+        return {
+            'mean': means,
+            'std': np.sqrt(np.maximum(squares / counts - means ** 2, 0)),
+            'count': counts
         }
+
+    return {
+        'Simple GroupBy': lambda: np.bincount(fd_data['category_code'], weights=fd_data['value'])
+                                  / np.bincount(fd_data['category_code']),
+        'Complex GroupBy': fd_complex_groupby,
+        # Return the row permutation only; gathering every column would copy the data
+        'Sort': lambda: np.lexsort((fd_data['category_code'], fd_data['value'])),
+        'Filter with Computation': fd_filter_with_computation
     }
-}
-
-# Run benchmarks
-results = {}
-for op_name, op_dict in operations.items():
-    print(f"\n{op_name} Operation:")
-    op_results = {}
-    for framework, op in op_dict.items():
-        metrics = benchmark_operation(op, framework)
-        print(f"  {format_metrics(metrics)}")
-        op_results[framework] = metrics
-    results[op_name] = op_results
-
-# Print summary
-print("\nSummary of Results:")
-for op_name, op_results in results.items():
-    print(f"\n{op_name}:")
-    sorted_results = sorted(op_results.items(), key=lambda x: x[1]['mean_time'])
-    fastest = sorted_results[0][0]
-    fastest_time = sorted_results[0][1]['mean_time']
-    
-    for framework, metrics in sorted_results:
-        speedup = metrics['mean_time'] / fastest_time
-        print(f"  {framework}: {metrics['mean_time']:.3f}s " + 
-              f"({'fastest' if framework == fastest else f'{speedup:.1f}x slower'})")
\ No newline at end of file
+
+def run_bench(framework: str, size: int) -> Dict[str, Dict[str, Any]]:
+    """Build one framework's data and benchmark all of its operations."""
+    builders = {
+        'Pandas': pandas_operations,
+        'Polars': polars_operations,
+        'FireDucks': fireducks_operations
+    }
+    operations = builders[framework](make_data(size))
+    # Polars allocates in Rust, out of tracemalloc's sight
+    trace_alloc = framework != 'Polars'
+    return {op_name: benchmark_operation(op, framework, trace_alloc=trace_alloc)
+            for op_name, op in operations.items()}
+
+def run_isolated(framework: str, size: int) -> Dict[str, Dict[str, Any]]:
+    """Run one framework's benchmarks in a fresh interpreter and collect the JSON result.
+
+    Keeps each framework's allocations and allocator state out of the others'
+    memory numbers.
+    """
+    proc = subprocess.run(
+        [sys.executable, __file__, '--framework', framework, '--size', str(size)],
+        # Only stdout carries the JSON; stderr stays on the terminal so a
+        # failing child's traceback is visible
+        stdout=subprocess.PIPE, text=True, check=True
+    )
+    return json.loads(proc.stdout)
+
+def print_results(results: Dict[str, Dict[str, Dict[str, Any]]], frameworks: List[str]):
+    """Print per-operation metrics followed by the speed summary."""
+    for op_name in OPERATIONS:
+        print(f"\n{op_name} Operation:")
+        for framework in frameworks:
+            print(f"  {format_metrics(results[framework][op_name])}")
+
+    batched = [framework for framework in frameworks if BATCHED_OPERATION in results[framework]]
+    if batched:
+        print(f"\n{BATCHED_OPERATION}:")
+        for framework in batched:
+            print(f"  {format_metrics(results[framework][BATCHED_OPERATION])}")
+
+    print("\nSummary of Results:")
+    for op_name in OPERATIONS:
+        print(f"\n{op_name}:")
+        op_results = {framework: results[framework][op_name] for framework in frameworks}
+        sorted_results = sorted(op_results.items(), key=lambda x: x[1]['mean_time'])
+        fastest = sorted_results[0][0]
+        fastest_time = sorted_results[0][1]['mean_time']
+        
+        for framework, metrics in sorted_results:
+            speedup = metrics['mean_time'] / fastest_time
+            print(f"  {framework}: {metrics['mean_time']:.3f}s " + 
+                  f"({'fastest' if framework == fastest else f'{speedup:.1f}x slower'})")
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare Pandas, Polars, and FireDucks performance.")
+    parser.add_argument('--framework', choices=FRAMEWORKS,
+                        help="Benchmark only this framework and print the results as JSON")
+    parser.add_argument('--size', type=int, default=1000000, help="Number of rows in the dataset")
+    args = parser.parse_args()
+
+    if args.framework:
+        json.dump(run_bench(args.framework, args.size), sys.stdout)
+        return
+
+    print("Testing performance across Pandas, Polars, and FireDucks...")
+    print(f"Dataset size: {args.size:,} rows")
+
+    results = {}
+    for framework in FRAMEWORKS:
+        print(f"Running {framework} benchmarks...")
+        results[framework] = run_isolated(framework, args.size)
+
+    print_results(results, FRAMEWORKS)
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,9 @@
-import random
 import os
 import time
 import json
-import pickle
-from typing import List, Set, Tuple, Optional
+import sys
+import numpy as np
+from typing import List, Set, Tuple
 from colorama import init, Fore, Back, Style
 from datetime import datetime
 
@@ -11,10 +11,63 @@ from datetime import datetime
 init(autoreset=True)
 
 # Constants
-SAVE_FILE = "sudoku_save.pkl"
+SAVE_FILE = "sudoku_save.npz"
 HIGH_SCORES_FILE = "high_scores.json"
 ACHIEVEMENTS_FILE = "achievements.json"
 
+# Erase the display and move the cursor home
+CLEAR_SCREEN = "\x1b[2J\x1b[H"
+
+# Pre-rendered pieces of the board frame, encoded once as UTF-8 bytes
+TITLE_LINES = [line.encode() for line in (
+    f"\n{Fore.CYAN}╔════════════════════════════════════════════╗{Style.RESET_ALL}",
+    f"{Fore.CYAN}║{Style.RESET_ALL}                    S U D O K U            {Fore.CYAN} ║{Style.RESET_ALL}",
+    f"{Fore.CYAN}╚════════════════════════════════════════════╝{Style.RESET_ALL}",
+)]
+CONTROLS_LINES = [line.encode() for line in (
+    "\nControls:",
+    "WASD: Move | 1-9: Number | Space: Notes | Tab: Auto-check",
+    "n: Notes | h: Hint | u: Undo | r: Redo | s: Save | l: Load",
+    "p: Pause | q: Quit",
+)]
+COLUMN_HEADER = f"\n    {Fore.CYAN}1 2 3   4 5 6   7 8 9{Style.RESET_ALL}".encode()
+BOX_TOP = f"  {Fore.CYAN}┌───────┬───────┬───────┐{Style.RESET_ALL}".encode()
+BOX_MID = f"  {Fore.CYAN}├───────┼───────┼───────┤{Style.RESET_ALL}".encode()
+BOX_BOTTOM = f"  {Fore.CYAN}└───────┴───────┴───────┘{Style.RESET_ALL}".encode()
+CYAN_BAR = f"{Fore.CYAN}│{Style.RESET_ALL}".encode()
+ROW_LABELS = [f"{Fore.CYAN}{i + 1}{Style.RESET_ALL} │ ".encode() for i in range(9)]
+PAUSED = f"{Fore.YELLOW}[PAUSED]{Style.RESET_ALL}"
+
+# Every rendering of a cell, indexed [background][foreground][value] for filled
+# cells and [background][has notes] for empty ones.
+# Backgrounds: plain, highlighted, selected. Foregrounds: user, original, conflict.
+CELL_BACKGROUNDS = (Back.RESET, Back.LIGHTBLACK_EX, Back.WHITE)
+CELL_FOREGROUNDS = (Fore.GREEN, Fore.BLUE, Fore.RED)
+FILLED_CELLS = [[[f"{bg}{fg}{value}{Style.RESET_ALL} ".encode() for value in range(10)]
+                 for fg in CELL_FOREGROUNDS] for bg in CELL_BACKGROUNDS]
+EMPTY_CELLS = [[f"{bg}{Fore.WHITE}·{Style.RESET_ALL} ".encode(),
+                f"{bg}{Fore.YELLOW}·{Style.RESET_ALL} ".encode()] for bg in CELL_BACKGROUNDS]
+
+# Single random source for board generation
+RNG = np.random.default_rng()
+
+# Box index of every cell
+BOX_INDEX = np.array([[3 * (i // 3) + j // 3 for j in range(9)] for i in range(9)], np.int8)
+FULL_MASK = 0x1FF
+
+# Solved grid that every new board is derived from
+CANONICAL = np.array([
+    [1, 2, 3, 4, 5, 6, 7, 8, 9],
+    [4, 5, 6, 7, 8, 9, 1, 2, 3],
+    [7, 8, 9, 1, 2, 3, 4, 5, 6],
+    [2, 3, 4, 5, 6, 7, 8, 9, 1],
+    [5, 6, 7, 8, 9, 1, 2, 3, 4],
+    [8, 9, 1, 2, 3, 4, 5, 6, 7],
+    [3, 4, 5, 6, 7, 8, 9, 1, 2],
+    [6, 7, 8, 9, 1, 2, 3, 4, 5],
+    [9, 1, 2, 3, 4, 5, 6, 7, 8],
+], np.int8)
+
 class Achievement:
     def __init__(self, name: str, description: str, condition: str):
         self.name = name
@@ -34,21 +87,51 @@ class Move:
         self.new_notes = new_notes.copy()
 
 class Cell:
-    def __init__(self):
-        self.value = 0
-        self.notes = set()
-        self.original = False
-        self.has_conflict = False
-        self.highlighted = False
+    """Read-only view of one board position, backed by the game's arrays."""
+    def __init__(self, game: 'SudokuGame', row: int, col: int):
+        self._game = game
+        self._row = row
+        self._col = col
+
+    @property
+    def value(self) -> int:
+        return int(self._game.values[self._row, self._col])
+
+    @property
+    def notes(self) -> Set[int]:
+        return {int(n) + 1 for n in np.flatnonzero(self._game.notes[self._row, self._col])}
+
+    @property
+    def original(self) -> bool:
+        return bool(self._game.original[self._row, self._col])
+
+    @property
+    def has_conflict(self) -> bool:
+        return bool(self._game.has_conflict[self._row, self._col])
+
+    @property
+    def highlighted(self) -> bool:
+        return bool(self._game.highlighted[self._row, self._col])
 
 class SudokuGame:
     def __init__(self):
-        self.board = [[Cell() for _ in range(9)] for _ in range(9)]
+        # Board state is stored as parallel arrays (one per cell attribute)
+        self.values = np.zeros((9, 9), np.int8)
+        self.original = np.zeros((9, 9), bool)
+        self.has_conflict = np.zeros((9, 9), bool)
+        self.highlighted = np.zeros((9, 9), bool)
+        self.notes = np.zeros((9, 9, 9), bool)  # notes[row, col, num - 1]
+        # Bit (num - 1) is set when num is already placed in that row/column/box
+        self.row_mask = np.zeros(9, np.uint16)
+        self.col_mask = np.zeros(9, np.uint16)
+        self.box_mask = np.zeros(9, np.uint16)
+        self.solution = np.zeros((9, 9), np.int8)  # Full answer, kept for hints
         self.selected_cell = (0, 0)
         self.mistakes = 0
         self.hint_count = 3
-        self.start_time = None
-        self.pause_time = 0
+        self.start_time = None  # time.monotonic() reading when play started
+        self.paused_accum = 0.0  # Seconds spent paused so far
+        self._paused_at = None
         self.is_paused = False
         self.moves_history = []
         self.redo_stack = []
@@ -66,8 +149,56 @@ class SudokuGame:
             "marathon": Achievement("Marathon", "Play for 1 hour total", "total_time >= 3600")
         }
 
+    def _reset_board(self):
+        self.values[:] = 0
+        self.original[:] = False
+        self.has_conflict[:] = False
+        self.highlighted[:] = False
+        self.notes[:] = False
+        self.row_mask[:] = 0
+        self.col_mask[:] = 0
+        self.box_mask[:] = 0
+
+    def _rebuild_masks(self):
+        self.row_mask[:] = 0
+        self.col_mask[:] = 0
+        self.box_mask[:] = 0
+        for i in range(9):
+            for j in range(9):
+                if self.values[i, j]:
+                    bit = 1 << (int(self.values[i, j]) - 1)
+                    self.row_mask[i] |= bit
+                    self.col_mask[j] |= bit
+                    self.box_mask[BOX_INDEX[i, j]] |= bit
+
+    def _set_value(self, row: int, col: int, num: int):
+        box = BOX_INDEX[row, col]
+        old = int(self.values[row, col])
+        self.values[row, col] = num
+        if old:
+            # A hint can duplicate a wrong entry, so only clear the bit in
+            # units where no other cell still holds old
+            bit = ~(1 << (old - 1)) & FULL_MASK
+            box_row, box_col = 3 * (row // 3), 3 * (col // 3)
+            if not (self.values[row, :] == old).any():
+                self.row_mask[row] &= bit
+            if not (self.values[:, col] == old).any():
+                self.col_mask[col] &= bit
+            if not (self.values[box_row:box_row + 3, box_col:box_col + 3] == old).any():
+                self.box_mask[box] &= bit
+        if num:
+            bit = 1 << (num - 1)
+            self.row_mask[row] |= bit
+            self.col_mask[col] |= bit
+            self.box_mask[box] |= bit
+
+    def cell(self, row: int, col: int) -> Cell:
+        return Cell(self, row, col)
+
     def clear_screen(self):
-        os.system('cls' if os.name == 'nt' else 'clear')
+        # colorama translates these escapes on older Windows consoles
+        sys.stdout.write(CLEAR_SCREEN)
+        sys.stdout.flush()
 
     def generate_puzzle(self, difficulty: int):
         self._generate_solved()
@@ -77,155 +208,134 @@ class SudokuGame:
             3: 56   # Hard: 25 hints
         }.get(difficulty, 41)
 
-        positions = [(i, j) for i in range(9) for j in range(9)]
-        random.shuffle(positions)
+        rows, cols = np.divmod(RNG.permutation(81)[:cells_to_remove], 9)
+        self.values[rows, cols] = 0
+        self.original[rows, cols] = False
+        self._rebuild_masks()
 
-        for i, j in positions[:cells_to_remove]:
-            self.board[i][j].value = 0
-            self.board[i][j].original = False
-
-        self.start_time = time.time()
+        self.start_time = time.monotonic()
+        self.paused_accum = 0.0
+        self.is_paused = False
 
     def _generate_solved(self):
-        for i in range(9):
-            for j in range(9):
-                self.board[i][j] = Cell()
-
-        self.board[0][0].value = random.randint(1, 9)
-        self.board[0][0].original = True
-
-        if self._solve():
-            for i in range(9):
-                for j in range(9):
-                    self.board[i][j].original = True
+        self._reset_board()
+
+        # Relabel the digits, then shuffle bands/stacks and the rows/columns
+        # inside them; every such transform keeps the grid a valid solution
+        perm = (RNG.permutation(9) + 1).astype(np.int8)
+        rows = np.concatenate([3 * band + RNG.permutation(3) for band in RNG.permutation(3)])
+        cols = np.concatenate([3 * stack + RNG.permutation(3) for stack in RNG.permutation(3)])
+        values = perm[CANONICAL - 1][rows][:, cols]
+        if RNG.random() < 0.5:
+            values = values.T
+
+        self.values[:] = values
+        self._rebuild_masks()
+        if ((self.row_mask == FULL_MASK).all() and (self.col_mask == FULL_MASK).all()
+                and (self.box_mask == FULL_MASK).all()):
+            self.original[:] = True
+            self.solution = self.values.copy()
             return True
         return False
 
-    def _solve(self) -> bool:
-        row, col = self._find_empty()
-        if row is None:
-            return True
-
-        numbers = list(range(1, 10))
-        random.shuffle(numbers)
-
-        for num in numbers:
-            if self._is_valid((row, col), num):
-                self.board[row][col].value = num
-                if self._solve():
-                    return True
-                self.board[row][col].value = 0
-
-        return False
-
-    def _find_empty(self) -> Tuple[Optional[int], Optional[int]]:
-        for i in range(9):
-            for j in range(9):
-                if self.board[i][j].value == 0:
-                    return i, j
-        return None, None
-
     def _is_valid(self, pos: Tuple[int, int], num: int) -> bool:
         row, col = pos
-        for j in range(9):
-            if j != col and self.board[row][j].value == num:
-                return False
-        for i in range(9):
-            if i != row and self.board[i][col].value == num:
-                return False
-        box_row, box_col = 3 * (row // 3), 3 * (col // 3)
-        for i in range(box_row, box_row + 3):
-            for j in range(box_col, box_col + 3):
-                if (i != row or j != col) and self.board[i][j].value == num:
-                    return False
-        return True
+        used = self.row_mask[row] | self.col_mask[col] | self.box_mask[BOX_INDEX[row, col]]
+        return not (used & (1 << (num - 1)))
 
     def print_board(self):
-        self.clear_screen()
-        print(f"\n{Fore.CYAN}╔════════════════════════════════════════════╗{Style.RESET_ALL}")
-        print(f"{Fore.CYAN}║{Style.RESET_ALL}                    S U D O K U            {Fore.CYAN} ║{Style.RESET_ALL}")
-        print(f"{Fore.CYAN}╚════════════════════════════════════════════╝{Style.RESET_ALL}")
-
-        # Controls section
-        print("\nControls:")
-        print("WASD: Move | 1-9: Number | Space: Notes | Tab: Auto-check")
-        print("n: Notes | h: Hint | u: Undo | r: Redo | s: Save | l: Load")
-        print("p: Pause | q: Quit")
+        frame = bytearray(CLEAR_SCREEN.encode())
+        lines = TITLE_LINES + CONTROLS_LINES
 
         # Status section
         difficulty_names = ["Easy", "Medium", "Hard"]
-        print(f"\nDifficulty: {difficulty_names[self.difficulty-1]}")
-        print(f"Mistakes: {'❌' * self.mistakes}")
-        print(f"Hints: {'💡' * self.hint_count}")
+        status_lines = [
+            f"\nDifficulty: {difficulty_names[self.difficulty-1]}",
+            f"Mistakes: {'❌' * self.mistakes}",
+            f"Hints: {'💡' * self.hint_count}",
+        ]
         
-        if self.start_time:
+        if self.start_time is not None:
             elapsed = self.get_elapsed_time()
-            status = f"{Fore.YELLOW}[PAUSED]{Style.RESET_ALL}" if self.is_paused else ""
-            print(f"Time: {elapsed//60:02d}:{elapsed%60:02d} {status}")
+            status = PAUSED if self.is_paused else ""
+            status_lines.append(f"Time: {elapsed//60:02d}:{elapsed%60:02d} {status}")
         
-        print(f"Score: {self.score}")
+        status_lines.append(f"Score: {self.score}")
+        lines += [line.encode() for line in status_lines]
 
         # Board section
-        print(f"\n    {Fore.CYAN}1 2 3   4 5 6   7 8 9{Style.RESET_ALL}")
-        print(f"  {Fore.CYAN}┌───────┬───────┬───────┐{Style.RESET_ALL}")
+        lines.append(COLUMN_HEADER)
+        lines.append(BOX_TOP)
+        frame += b"\n".join(lines)
+        frame += b"\n"
         
+        selected = np.zeros((9, 9), bool)
+        selected[self.selected_cell] = True
+        backgrounds = np.where(selected, 2, self.highlighted).tolist()
+        foregrounds = np.where(self.has_conflict, 2, self.original).tolist()
+        has_notes = self.notes.any(axis=2).tolist()
+        values = self.values.tolist()
         for i in range(9):
-            print(f"{Fore.CYAN}{i + 1}{Style.RESET_ALL} │", end=" ")
+            frame += ROW_LABELS[i]
             for j in range(9):
-                cell = self.board[i][j]
-                
-                # Cell background
-                bg_color = Back.WHITE if (i, j) == self.selected_cell else \
-                          Back.LIGHTBLACK_EX if cell.highlighted else Back.RESET
-
-                # Cell foreground
-                if cell.has_conflict:
-                    fg_color = Fore.RED
-                elif cell.original:
-                    fg_color = Fore.BLUE
-                else:
-                    fg_color = Fore.GREEN
-
-                # Cell content
-                if cell.value != 0:
-                    print(f"{bg_color}{fg_color}{cell.value}{Style.RESET_ALL}", end=" ")
+                bg = backgrounds[i][j]
+                value = values[i][j]
+                if value != 0:
+                    frame += FILLED_CELLS[bg][foregrounds[i][j]][value]
                 else:
-                    notes_str = "·" if cell.notes else "·"
-                    color = Fore.YELLOW if cell.notes else Fore.WHITE
-                    print(f"{bg_color}{color}{notes_str}{Style.RESET_ALL}", end=" ")
+                    frame += EMPTY_CELLS[bg][has_notes[i][j]]
                 
                 if j in {2, 5}:
-                    print(f"{Fore.CYAN}│{Style.RESET_ALL}", end=" ")
-            print(f"{Fore.CYAN}│{Style.RESET_ALL}")
+                    frame += CYAN_BAR + b" "
+            frame += CYAN_BAR + b"\n"
             if i in {2, 5}:
-                print(f"  {Fore.CYAN}├───────┼───────┼───────┤{Style.RESET_ALL}")
-        print(f"  {Fore.CYAN}└───────┴───────┴───────┘{Style.RESET_ALL}")
+                frame += BOX_MID + b"\n"
+        frame += BOX_BOTTOM + b"\n"
 
         # Notes for selected cell
-        cell = self.board[self.selected_cell[0]][self.selected_cell[1]]
+        cell = self.cell(*self.selected_cell)
         if cell.notes:
             notes_list = sorted(cell.notes)
-            print(f"\nNotes: {', '.join(map(str, notes_list))}")
+            frame += f"\nNotes: {', '.join(map(str, notes_list))}\n".encode()
+
+        frame += f"\nAuto-check: {'ON' if self.auto_check else 'OFF'}\n".encode()
+        self._write_frame(frame)
 
-        print(f"\nAuto-check: {'ON' if self.auto_check else 'OFF'}")
+    def _write_frame(self, frame: bytearray):
+        sys.stdout.flush()  # Keep earlier print() output ahead of the frame
+        try:
+            fd = sys.stdout.fileno()
+        except (AttributeError, OSError):
+            fd = None
+        # Windows consoles rely on colorama's stdout wrapper for the escapes,
+        # IDE consoles have no file descriptor, and colorama strips escapes
+        # from redirected output; all of these take the text path
+        if fd is None or os.name == 'nt' or not sys.stdout.isatty():
+            sys.stdout.write(frame.decode())
+            sys.stdout.flush()
+            return
+        view = memoryview(frame)
+        while view:
+            view = view[os.write(fd, view):]
 
     def make_move(self, row: int, col: int, num: int, note_mode: bool = False) -> bool:
-        if self.board[row][col].original:
+        if self.original[row, col]:
             return False
 
         if note_mode:
-            if num in self.board[row][col].notes:
-                self.board[row][col].notes.remove(num)
-            else:
-                self.board[row][col].notes.add(num)
+            self.notes[row, col, num - 1] = not self.notes[row, col, num - 1]
             return True
 
+        # Take the current value out of the masks so it doesn't block itself
+        old = int(self.values[row, col])
+        self._set_value(row, col, 0)
         if not self._is_valid((row, col), num):
+            self._set_value(row, col, old)
             self.mistakes += 1
             return False
 
-        self.board[row][col].value = num
-        self.board[row][col].notes.clear()
+        self._set_value(row, col, num)
+        self.notes[row, col] = False
         return True
 
     def use_hint(self) -> bool:
@@ -233,60 +343,79 @@ class SudokuGame:
             return False
 
         row, col = self.selected_cell
-        if self.board[row][col].original or self.board[row][col].value != 0:
+        if self.original[row, col] or self.values[row, col] != 0:
             return False
 
-        temp_board = [[self.board[i][j].value for j in range(9)] for i in range(9)]
-        temp_game = SudokuGame()
-        temp_game.board = [[Cell() for _ in range(9)] for _ in range(9)]
-        for i in range(9):
-            for j in range(9):
-                temp_game.board[i][j].value = temp_board[i][j]
-
-        if temp_game._solve():
-            self.board[row][col].value = temp_game.board[row][col].value
-            self.board[row][col].original = True
-            self.hint_count -= 1
-            return True
-        return False
+        self._set_value(row, col, int(self.solution[row, col]))
+        self.original[row, col] = True
+        self.hint_count -= 1
+        return True
 
     def is_complete(self) -> bool:
-        for i in range(9):
-            for j in range(9):
-                if self.board[i][j].value == 0:
-                    return False
-        return True
+        return not (self.values == 0).any()
 
     def save_game(self):
-        game_state = {
-            'board': self.board,
-            'mistakes': self.mistakes,
-            'hint_count': self.hint_count,
-            'start_time': self.start_time,
-            'pause_time': self.pause_time,
-            'score': self.score,
-            'difficulty': self.difficulty,
-            'achievements': self.achievements
-        }
-        with open(SAVE_FILE, 'wb') as f:
-            pickle.dump(game_state, f)
+        names = list(self.achievements)
+        np.savez_compressed(
+            SAVE_FILE,
+            values=self.values,
+            solution=self.solution,
+            original=np.packbits(self.original),
+            notes=np.packbits(self.notes),
+            mistakes=self.mistakes,
+            hint_count=self.hint_count,
+            # Monotonic readings mean nothing in another process, so store the
+            # elapsed play time and rebase it on load
+            started=self.start_time is not None,
+            elapsed=self.get_elapsed_time(),
+            score=self.score,
+            difficulty=self.difficulty,
+            achievement_names=np.array(names),
+            achievement_earned=np.array([self.achievements[n].earned for n in names], bool),
+            achievement_dates=np.array([self.achievements[n].earned_date.isoformat()
+                                        if self.achievements[n].earned_date else ""
+                                        for n in names])
+        )
 
     def load_game(self) -> bool:
+        # Parse everything first so a bad or partial save leaves the game untouched
         try:
-            with open(SAVE_FILE, 'rb') as f:
-                game_state = pickle.load(f)
-                self.board = game_state['board']
-                self.mistakes = game_state['mistakes']
-                self.hint_count = game_state['hint_count']
-                self.start_time = game_state['start_time']
-                self.pause_time = game_state['pause_time']
-                self.score = game_state['score']
-                self.difficulty = game_state['difficulty']
-                self.achievements = game_state.get('achievements', self._init_achievements())
-                return True
+            with np.load(SAVE_FILE) as game_state:
+                values = game_state['values']
+                original = np.unpackbits(game_state['original'], count=81).reshape(9, 9).astype(bool)
+                notes = np.unpackbits(game_state['notes'], count=729).reshape(9, 9, 9).astype(bool)
+                solution = game_state['solution']
+                mistakes = int(game_state['mistakes'])
+                hint_count = int(game_state['hint_count'])
+                started = bool(game_state['started'])
+                elapsed = int(game_state['elapsed'])
+                score = int(game_state['score'])
+                difficulty = int(game_state['difficulty'])
+                achievements = self._init_achievements()
+                for name, earned, date in zip(game_state['achievement_names'],
+                                              game_state['achievement_earned'],
+                                              game_state['achievement_dates']):
+                    if name in achievements:
+                        achievements[name].earned = bool(earned)
+                        achievements[name].earned_date = datetime.fromisoformat(date) if date else None
         except:
             return False
 
+        self.values = values
+        self.original = original
+        self.notes = notes
+        self._rebuild_masks()
+        self.solution = solution
+        self.mistakes = mistakes
+        self.hint_count = hint_count
+        self.start_time = time.monotonic() - elapsed if started else None
+        self.paused_accum = 0.0
+        self.is_paused = False
+        self.score = score
+        self.difficulty = difficulty
+        self.achievements = achievements
+        return True
+
     def update_high_scores(self):
         scores = []
         try:
@@ -321,72 +450,48 @@ class SudokuGame:
 
     def pause_game(self):
         if not self.is_paused:
-            self.pause_time = time.time()
+            self._paused_at = time.monotonic()
             self.is_paused = True
         else:
-            self.pause_time = time.time() - self.pause_time
+            self.paused_accum += time.monotonic() - self._paused_at
             self.is_paused = False
 
     def get_elapsed_time(self) -> int:
-        if not self.start_time:
+        if self.start_time is None:
             return 0
-        if self.is_paused:
-            return int(self.pause_time - self.start_time - self.pause_time)
-        return int(time.time() - self.start_time - self.pause_time)
+        # While paused the clock stands still at the moment of pausing
+        now = self._paused_at if self.is_paused else time.monotonic()
+        return int(now - self.start_time - self.paused_accum)
 
     def update_conflicts(self):
         if not self.auto_check:
             return
 
-        for i in range(9):
-            for j in range(9):
-                self.board[i][j].has_conflict = False
-
-        for i in range(9):
-            for j in range(9):
-                if self.board[i][j].value == 0:
-                    continue
-                
-                # Check row and column
-                for k in range(9):
-                    if k != j and self.board[i][k].value == self.board[i][j].value:
-                        self.board[i][j].has_conflict = True
-                        self.board[i][k].has_conflict = True
-                    if k != i and self.board[k][j].value == self.board[i][j].value:
-                        self.board[i][j].has_conflict = True
-                        self.board[k][j].has_conflict = True
-
-                # Check box
-                box_row, box_col = 3 * (i // 3), 3 * (j // 3)
-                for r in range(box_row, box_row + 3):
-                    for c in range(box_col, box_col + 3):
-                        if (r != i or c != j) and self.board[r][c].value == self.board[i][j].value:
-                            self.board[i][j].has_conflict = True
-                            self.board[r][c].has_conflict = True
+        conflict = np.zeros((9, 9), bool)
+        for num in range(1, 10):
+            mask = self.values == num
+            # Rows, columns and boxes where this number appears more than once
+            row_dup = mask.sum(axis=1) > 1
+            col_dup = mask.sum(axis=0) > 1
+            box_dup = mask.reshape(3, 3, 3, 3).sum(axis=(1, 3)) > 1
+            conflict |= mask & row_dup[:, None]
+            conflict |= mask & col_dup[None, :]
+            conflict |= mask & np.repeat(np.repeat(box_dup, 3, axis=0), 3, axis=1)
+        self.has_conflict = conflict
 
     def highlight_related(self, row: int, col: int):
-        # Reset highlights
-        for i in range(9):
-            for j in range(9):
-                self.board[i][j].highlighted = False
-
         # Highlight same row, column, and box
-        for i in range(9):
-            self.board[row][i].highlighted = True
-            self.board[i][col].highlighted = True
-
+        highlighted = np.zeros((9, 9), bool)
+        highlighted[row, :] = True
+        highlighted[:, col] = True
         box_row, box_col = 3 * (row // 3), 3 * (col // 3)
-        for i in range(box_row, box_row + 3):
-            for j in range(box_col, box_col + 3):
-                self.board[i][j].highlighted = True
+        highlighted[box_row:box_row + 3, box_col:box_col + 3] = True
 
         # Highlight same value
-        value = self.board[row][col].value
+        value = self.values[row, col]
         if value != 0:
-            for i in range(9):
-                for j in range(9):
-                    if self.board[i][j].value == value:
-                        self.board[i][j].highlighted = True
+            highlighted |= self.values == value
+        self.highlighted = highlighted
 
 def show_high_scores():
     try:
@@ -0,0 +1,37 @@
+import numpy as np
+
+import sudoku
+
+
+def _masks(game):
+    return game.row_mask.copy(), game.col_mask.copy(), game.box_mask.copy()
+
+
+def test_hint_duplicating_wrong_entry_keeps_masks_in_sync():
+    sudoku.RNG = np.random.default_rng(0)
+    game = sudoku.SudokuGame()
+    game.generate_puzzle(3)
+
+    # Find two empty cells a, b in one row where b's answer is a legal but
+    # wrong entry for a
+    for row in range(9):
+        empty = [int(c) for c in np.flatnonzero(game.values[row] == 0)]
+        pairs = [(a, b) for a in empty for b in empty
+                 if a != b and game._is_valid((row, a), int(game.solution[row, b]))]
+        if pairs and len(empty) > 2:
+            a, b = pairs[0]
+            break
+    digit = int(game.solution[row, b])
+
+    assert game.make_move(row, a, digit)
+    game.selected_cell = (row, b)
+    assert game.use_hint()  # Puts a second copy of digit in the row
+
+    # Overwrite the player's copy; the hinted copy must keep digit blocked
+    game.make_move(row, a, int(game.solution[row, a]))
+    live = _masks(game)
+    game._rebuild_masks()
+    assert all((x == y).all() for x, y in zip(live, _masks(game)))
+
+    other = next(int(c) for c in np.flatnonzero(game.values[row] == 0))
+    assert not game.make_move(row, other, digit)